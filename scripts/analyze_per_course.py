@@ -20,6 +20,8 @@ import requests
 from dotenv import load_dotenv
 import warnings
 
+from utils.storage import load_table
+
 warnings.filterwarnings('ignore')
 load_dotenv()
 
@@ -96,7 +98,7 @@ def find_quality_courses():
 
 def analyze_existing_data():
     """Analyze per-course performance from existing feature data."""
-    df = pd.read_csv('data/engagement_dynamics/student_features.csv')
+    df = load_table('data/engagement_dynamics/student_features.csv')
 
     # Get feature columns
     exclude = ['course_id', 'user_id', 'user_role', 'final_score', 'failed']
@@ -83,34 +83,30 @@ def calculate_time_features(activity_data):
 
     page_views = activity_data.get('page_views', {})
 
-    # Aggregate by hour of day
-    hourly = {}
+    # Aggregate by hour of day (index = hour)
+    hourly = [0] * 24
     for timestamp, count in page_views.items():
         try:
             dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            hour = dt.hour
-            hourly[hour] = hourly.get(hour, 0) + count
-        except:
+            hourly[dt.hour] += count
+        except (ValueError, TypeError):
             continue
 
-    if not hourly:
-        return {}
-
-    total = sum(hourly.values())
+    total = sum(hourly)
     if total == 0:
         return {}
 
     # Time-of-day distribution
-    morning = sum(hourly.get(h, 0) for h in range(6, 12))
-    afternoon = sum(hourly.get(h, 0) for h in range(12, 18))
-    evening = sum(hourly.get(h, 0) for h in range(18, 24))
-    night = sum(hourly.get(h, 0) for h in range(0, 6))
+    morning = sum(hourly[6:12])
+    afternoon = sum(hourly[12:18])
+    evening = sum(hourly[18:24])
+    night = sum(hourly[0:6])
 
     # Unique active hours
-    unique_hours = len([h for h, c in hourly.items() if c > 0])
+    unique_hours = sum(1 for c in hourly if c > 0)
 
     # Time concentration (Gini-like)
-    props = [hourly.get(h, 0) / total for h in range(24)]
+    props = [c / total for c in hourly]
     time_concentration = sum(p * p for p in props if p > 0)
 
     # Activity timestamps for gap analysis
@@ -120,7 +116,7 @@ def calculate_time_features(activity_data):
             try:
                 dt = datetime.fromisoformat(ts_str.replace('Z', '+00:00'))
                 timestamps.append(dt)
-            except:
+            except (ValueError, TypeError):
                 continue
 
     timestamps.sort()
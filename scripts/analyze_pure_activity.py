@@ -18,6 +18,8 @@ from sklearn.model_selection import cross_val_score
 from sklearn.preprocessing import StandardScaler
 import warnings
 
+from utils.storage import load_table
+
 warnings.filterwarnings('ignore')
 
 # Features that are LEAKY (directly tied to grades)
@@ -76,7 +78,7 @@ PURE_ACTIVITY_FEATURES = [
 
 def analyze_pure_activity():
     """Analyze per-course using only pure activity features."""
-    df = pd.read_csv('data/engagement_dynamics/student_features.csv')
+    df = load_table('data/engagement_dynamics/student_features.csv')
 
     # Get only pure activity features that exist in the data
     available_features = [f for f in PURE_ACTIVITY_FEATURES if f in df.columns]
@@ -98,15 +100,15 @@ def analyze_pure_activity():
         if n_students < 10:
             continue
 
-        y = course_df['final_score'].values
-        grade_std = np.std(y)
-        grade_mean = np.mean(y)
+        y = course_df['final_score'].to_numpy(dtype=float)
+        grade_std = y.std()
+        grade_mean = y.mean()
 
         if grade_std < 5:
             continue
 
         # Calculate pass rate
-        pass_rate = sum(1 for g in y if g >= 57) / len(y)
+        pass_rate = np.count_nonzero(y >= 57) / y.size
 
         # Check if we have meaningful class diversity
         if pass_rate == 0 or pass_rate == 1:
@@ -284,7 +284,7 @@ class EarlyWarningSystem:
                 try:
                     ct = datetime.fromisoformat(m['completed_at'].replace('Z', '+00:00'))
                     completion_times.append(ct)
-                except:
+                except (ValueError, TypeError):
                     pass
 
         if completion_times:
@@ -320,7 +320,7 @@ class EarlyWarningSystem:
                     hour_counts['evening'] += count
                 else:
                     hour_counts['night'] += count
-            except:
+            except (ValueError, TypeError):
                 pass
 
         features['morning_activity'] = hour_counts['morning']
@@ -356,7 +356,7 @@ class EarlyWarningSystem:
                 start = datetime.fromisoformat(course_start.replace('Z', '+00:00'))
                 first = datetime.fromisoformat(features['first_activity_at'])
                 features['days_to_first_activity'] = (first - start).days
-            except:
+            except (ValueError, TypeError):
                 features['days_to_first_activity'] = None
         else:
             features['days_to_first_activity'] = None
@@ -391,7 +391,7 @@ class EarlyWarningSystem:
                     try:
                         t = datetime.fromisoformat(row['first_module_completed_at'])
                         times.append((idx, t))
-                    except:
+                    except (ValueError, TypeError):
                         times.append((idx, None))
                 else:
                     times.append((idx, None))
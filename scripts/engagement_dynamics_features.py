@@ -23,12 +23,14 @@ import time
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import Counter, defaultdict
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields
 from dotenv import load_dotenv
 import requests
 
+from utils.storage import save_table
+
 # Optional imports with fallbacks
 try:
     from scipy.fftpack import dct
@@ -71,6 +73,14 @@ TEST_COURSES = [
 # Session threshold in hours
 SESSION_GAP_THRESHOLD = 1.0  # 60 minutes = new session
 
+# Time block name by [is_weekend][hour]: morning 6-12, afternoon 12-18,
+# evening 18-24, night 0-6
+_TIME_SLOTS = ['night'] * 6 + ['morning'] * 6 + ['afternoon'] * 6 + ['evening'] * 6
+TIME_BLOCKS = tuple(
+    tuple(f'{day_type}_{slot}' for slot in _TIME_SLOTS)
+    for day_type in ('weekday', 'weekend')
+)
+
 
 @dataclass
 class EngagementFeatures:
@@ -155,6 +165,26 @@ class EngagementFeatures:
     unique_active_hours: int = 0
 
 
+FEATURE_COLUMNS = [f.name for f in fields(EngagementFeatures)]
+
+
+def new_feature_table() -> Dict[str, list]:
+    """Empty column-oriented buffer: one list per EngagementFeatures field."""
+    return {name: [] for name in FEATURE_COLUMNS}
+
+
+def append_features(table: Dict[str, list], features: EngagementFeatures):
+    """Append one row of features to a column buffer (no per-row dict copy)."""
+    for name in FEATURE_COLUMNS:
+        table[name].append(getattr(features, name))
+
+
+def extend_features(table: Dict[str, list], other: Dict[str, list]):
+    """Concatenate another column buffer onto table."""
+    for name in FEATURE_COLUMNS:
+        table[name].extend(other[name])
+
+
 def paginate(url: str, params: dict = None, max_pages: int = 20) -> List[dict]:
     """Paginate through Canvas API results."""
     all_results = []
@@ -221,6 +251,15 @@ def get_user_activity(course_id: int, user_id: int) -> dict:
     return r.json()
 
 
+def _in_course(url: str, needle: str) -> bool:
+    """True if url contains needle ('/courses/<id>') as a whole path segment."""
+    i = url.find(needle)
+    if i < 0:
+        return False
+    end = i + len(needle)
+    return url[end:end + 1] in ('', '/', '?', '#')
+
+
 def get_user_page_views(user_id: int, start_time: str, end_time: str, course_id: int = None) -> List[dict]:
     """Get page views for a user (used for teachers/TAs)."""
     page_views = paginate(
@@ -231,8 +270,9 @@ def get_user_page_views(user_id: int, start_time: str, end_time: str, course_id:
 
     # Filter to course if specified
     if course_id and page_views:
-        pattern = f'/courses/{course_id}'
-        page_views = [pv for pv in page_views if pattern in pv.get('url', '')]
+        # Boundary-checked so course 123 does not also match /courses/1234
+        needle = f'/courses/{course_id}'
+        page_views = [pv for pv in page_views if _in_course(pv.get('url') or '', needle)]
 
     return page_views
 
@@ -332,31 +372,15 @@ def calculate_time_block_features(timestamps: List[datetime]) -> Dict[str, float
     if not timestamps:
         return features
 
-    # Count by block
-    blocks = defaultdict(int)
-    weekly_blocks = defaultdict(lambda: defaultdict(int))  # week -> block -> count
-
-    for ts in timestamps:
-        is_weekend = ts.weekday() >= 5
-        hour = ts.hour
-
-        # Determine time of day
-        if 6 <= hour < 12:
-            time_slot = 'morning'
-        elif 12 <= hour < 18:
-            time_slot = 'afternoon'
-        elif 18 <= hour < 24:
-            time_slot = 'evening'
-        else:
-            time_slot = 'night'
-
-        day_type = 'weekend' if is_weekend else 'weekday'
-        block = f'{day_type}_{time_slot}'
-        blocks[block] += 1
-
-        # Track by week for consistency calculation
-        week_num = ts.isocalendar()[1]
-        weekly_blocks[week_num][block] += 1
+    # Count by block, and by week for the consistency calculation
+    week_blocks = Counter(
+        (ts.isocalendar()[1], TIME_BLOCKS[ts.weekday() >= 5][ts.hour]) for ts in timestamps
+    )
+    blocks = Counter()
+    weekly_blocks = defaultdict(Counter)  # week -> block -> count
+    for (week_num, block), count in week_blocks.items():
+        blocks[block] += count
+        weekly_blocks[week_num][block] = count
 
     total = sum(blocks.values())
     if total == 0:
@@ -448,10 +472,7 @@ def calculate_trajectory_features(timestamps: List[datetime]) -> Dict[str, float
         return features
 
     # Group by week
-    weekly_counts = defaultdict(int)
-    for ts in timestamps:
-        week_num = ts.isocalendar()[1]
-        weekly_counts[week_num] += 1
+    weekly_counts = Counter(ts.isocalendar()[1] for ts in timestamps)
 
     if len(weekly_counts) < 2:
         return features
@@ -517,10 +538,7 @@ def calculate_workload_dynamics(timestamps: List[datetime]) -> Dict[str, float]:
         return features
 
     # Group by week
-    weekly_counts = defaultdict(int)
-    for ts in timestamps:
-        week_num = ts.isocalendar()[1]
-        weekly_counts[week_num] += 1
+    weekly_counts = Counter(ts.isocalendar()[1] for ts in timestamps)
 
     if len(weekly_counts) < 2:
         return features
@@ -708,23 +726,18 @@ def extract_teacher_features(
 
     page_views = get_user_page_views(user_id, start_str, end_str, course_id)
 
-    # Convert page views to timestamps
-    timestamps = []
-    for pv in page_views:
-        created_at = pv.get('created_at')
-        if created_at:
-            try:
-                dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                timestamps.append(dt)
-            except (ValueError, TypeError):
-                pass
-    timestamps.sort()
+    # Convert page views to timestamps in one vectorized pass (unparseable -> NaT)
+    created = pd.to_datetime(
+        pd.Series([pv.get('created_at') for pv in page_views], dtype=object),
+        utc=True, errors='coerce', format='ISO8601'
+    ).dropna().sort_values()
+    timestamps = list(created.dt.to_pydatetime())
 
     features.total_page_views = len(page_views)
 
     if timestamps:
-        features.activity_span_days = (max(timestamps) - min(timestamps)).days
-        features.unique_active_hours = len(set(ts.replace(minute=0, second=0, microsecond=0) for ts in timestamps))
+        features.activity_span_days = (created.iloc[-1] - created.iloc[0]).days
+        features.unique_active_hours = created.dt.floor('h').nunique()
 
     course_weeks = ((course_end - course_start).days / 7) if (course_start and course_end) else 15
     course_weeks = max(1, course_weeks)
@@ -767,8 +780,8 @@ def normalize_features(df: pd.DataFrame, features_to_normalize: List[str]) -> pd
     return df_normalized
 
 
-def extract_course_features(course: dict, include_teachers: bool = True) -> Tuple[List[dict], List[dict]]:
-    """Extract all features for a course."""
+def extract_course_features(course: dict, include_teachers: bool = True) -> Tuple[Dict[str, list], Dict[str, list]]:
+    """Extract all features for a course as (student, teacher) column tables from new_feature_table()."""
     course_id = course['id']
     course_name = course['name']
 
@@ -812,7 +825,7 @@ def extract_course_features(course: dict, include_teachers: bool = True) -> Tupl
     print(f"  Activity summaries: {len(summaries)}")
 
     # Extract student features
-    student_features = []
+    student_features = new_feature_table()
     for i, enrollment in enumerate(enrollments):
         user_id = enrollment['user_id']
         summary = summaries_dict.get(user_id)
@@ -820,16 +833,16 @@ def extract_course_features(course: dict, include_teachers: bool = True) -> Tupl
         features = extract_student_features(
             course_id, user_id, enrollment, summary, course_start, course_end
         )
-        student_features.append(asdict(features))
+        append_features(student_features, features)
 
         if (i + 1) % 10 == 0:
             print(f"    Processed {i + 1}/{len(enrollments)} students...")
         time.sleep(0.3)  # Rate limiting
 
-    print(f"  Extracted features for {len(student_features)} students")
+    print(f"  Extracted features for {len(student_features['user_id'])} students")
 
     # Extract teacher features
-    teacher_features = []
+    teacher_features = new_feature_table()
     if include_teachers:
         teacher_enrollments = get_enrollments(course_id, 'TeacherEnrollment')
         ta_enrollments = get_enrollments(course_id, 'TaEnrollment')
@@ -840,10 +853,10 @@ def extract_course_features(course: dict, include_teachers: bool = True) -> Tupl
         for enrollment in all_instructor_enrollments:
             user_id = enrollment['user_id']
             features = extract_teacher_features(course_id, user_id, enrollment, course_start, course_end)
-            teacher_features.append(asdict(features))
+            append_features(teacher_features, features)
             time.sleep(0.3)
 
-        print(f"  Extracted features for {len(teacher_features)} teachers/TAs")
+        print(f"  Extracted features for {len(teacher_features['user_id'])} teachers/TAs")
 
     return student_features, teacher_features
 
@@ -854,17 +867,17 @@ def main():
     print("ENGAGEMENT DYNAMICS FEATURE EXTRACTION")
     print("=" * 70)
 
-    all_student_features = []
-    all_teacher_features = []
+    all_student_features = new_feature_table()
+    all_teacher_features = new_feature_table()
 
     for course in TEST_COURSES:
         student_features, teacher_features = extract_course_features(course, include_teachers=True)
-        all_student_features.extend(student_features)
-        all_teacher_features.extend(teacher_features)
+        extend_features(all_student_features, student_features)
+        extend_features(all_teacher_features, teacher_features)
 
-    # Create DataFrames
-    df_students = pd.DataFrame(all_student_features)
-    df_teachers = pd.DataFrame(all_teacher_features)
+    # Create DataFrames (columns are already laid out per field)
+    df_students = pd.DataFrame(all_student_features, columns=FEATURE_COLUMNS)
+    df_teachers = pd.DataFrame(all_teacher_features, columns=FEATURE_COLUMNS)
 
     print(f"\n{'='*70}")
     print(f"SUMMARY")
@@ -887,8 +900,8 @@ def main():
     output_dir = 'data/engagement_dynamics'
     os.makedirs(output_dir, exist_ok=True)
 
-    df_students.to_csv(f'{output_dir}/student_features.csv', index=False)
-    df_teachers.to_csv(f'{output_dir}/teacher_features.csv', index=False)
+    save_table(df_students, f'{output_dir}/student_features.csv')
+    save_table(df_teachers, f'{output_dir}/teacher_features.csv')
 
     print(f"\nSaved to {output_dir}/")
     print(f"  - student_features.csv ({len(df_students)} rows, {len(df_students.columns)} columns)")
@@ -22,6 +22,7 @@ from matplotlib.gridspec import GridSpec
 # Configuration
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from config import API_URL, API_TOKEN, DATA_DIR, HIGH_POTENTIAL_COURSES
+from utils.pagination import count_canvas_items, parse_json
 
 # Style configuration for professional look
 plt.style.use('seaborn-v0_8-whitegrid')
@@ -48,55 +49,32 @@ def fetch_course_details(course_ids):
 
     for i, course_id in enumerate(course_ids):
         try:
+            base_url = f'{API_URL}/api/v1/courses/{course_id}'
+
             # Basic course info
             r = requests.get(
-                f'{API_URL}/api/v1/courses/{course_id}',
+                base_url,
                 headers=HEADERS,
                 params={'include[]': ['total_students', 'term']}
             )
             if r.status_code != 200:
                 continue
-            course = r.json()
+            course = parse_json(r)
 
             # Get modules count
-            r_mod = requests.get(
-                f'{API_URL}/api/v1/courses/{course_id}/modules',
-                headers=HEADERS,
-                params={'per_page': 100}
-            )
-            modules = len(r_mod.json()) if r_mod.status_code == 200 else 0
+            modules = count_canvas_items(base_url + '/modules', HEADERS)
 
             # Get assignments count
-            r_asgn = requests.get(
-                f'{API_URL}/api/v1/courses/{course_id}/assignments',
-                headers=HEADERS,
-                params={'per_page': 100}
-            )
-            assignments = len(r_asgn.json()) if r_asgn.status_code == 200 else 0
+            assignments = count_canvas_items(base_url + '/assignments', HEADERS)
 
             # Get pages count
-            r_pages = requests.get(
-                f'{API_URL}/api/v1/courses/{course_id}/pages',
-                headers=HEADERS,
-                params={'per_page': 100}
-            )
-            pages = len(r_pages.json()) if r_pages.status_code == 200 else 0
+            pages = count_canvas_items(base_url + '/pages', HEADERS)
 
             # Get files count
-            r_files = requests.get(
-                f'{API_URL}/api/v1/courses/{course_id}/files',
-                headers=HEADERS,
-                params={'per_page': 100}
-            )
-            files = len(r_files.json()) if r_files.status_code == 200 else 0
+            files = count_canvas_items(base_url + '/files', HEADERS)
 
             # Get quizzes count
-            r_quiz = requests.get(
-                f'{API_URL}/api/v1/courses/{course_id}/quizzes',
-                headers=HEADERS,
-                params={'per_page': 100}
-            )
-            quizzes = len(r_quiz.json()) if r_quiz.status_code == 200 else 0
+            quizzes = count_canvas_items(base_url + '/quizzes', HEADERS)
 
             courses_data.append({
                 'course_id': course_id,
@@ -127,7 +105,12 @@ def load_model_results():
         return json.load(f)
 
 
-def create_executive_summary_chart(model_results, courses_data, output_dir):
+def rank_courses(courses_data):
+    """Sort courses by total LMS resources, descending (shared by all charts)."""
+    return sorted(courses_data, key=lambda x: x['total_resources'], reverse=True)
+
+
+def create_executive_summary_chart(model_results, courses_data, output_dir, ranked_courses=None):
     """Create the main executive summary visualization."""
 
     fig = plt.figure(figsize=(16, 10))
@@ -246,8 +229,10 @@ def create_executive_summary_chart(model_results, courses_data, output_dir):
     ax5 = fig.add_subplot(gs[1, 1:])
 
     if courses_data:
-        # Sort by total resources and get top 10
-        sorted_courses = sorted(courses_data, key=lambda x: x['total_resources'], reverse=True)[:10]
+        # Top 10 by total resources
+        if ranked_courses is None:
+            ranked_courses = rank_courses(courses_data)
+        sorted_courses = ranked_courses[:10]
 
         course_names = [c['name'][:30] + '...' if len(c['name']) > 30 else c['name'] for c in sorted_courses]
         resources = [c['total_resources'] for c in sorted_courses]
@@ -400,7 +385,7 @@ def create_model_performance_detail(model_results, output_dir):
     return output_path
 
 
-def create_lms_design_analysis(courses_data, output_dir):
+def create_lms_design_analysis(courses_data, output_dir, ranked_courses=None):
     """Create LMS design quality analysis visualization."""
 
     if not courses_data:
@@ -415,7 +400,9 @@ def create_lms_design_analysis(courses_data, output_dir):
     ax1 = axes[0, 0]
 
     # Create matrix for heatmap
-    sorted_courses = sorted(courses_data, key=lambda x: x['total_resources'], reverse=True)[:15]
+    if ranked_courses is None:
+        ranked_courses = rank_courses(courses_data)
+    sorted_courses = ranked_courses[:15]
     course_names = [c['name'][:20] + '...' if len(c['name']) > 20 else c['name'] for c in sorted_courses]
 
     resource_matrix = np.array([
@@ -681,6 +668,9 @@ def generate_report():
     courses_data = fetch_course_details(HIGH_POTENTIAL_COURSES)
     print(f"  Fetched details for {len(courses_data)} courses")
 
+    # Rank once; the summary and design charts both slice from it
+    ranked_courses = rank_courses(courses_data)
+
     # Generate visualizations
     print("\nGenerating visualizations...")
 
@@ -688,7 +678,7 @@ def generate_report():
 
     # 1. Executive Summary
     print("\n1. Creating Executive Summary...")
-    chart1 = create_executive_summary_chart(model_results, courses_data, output_dir)
+    chart1 = create_executive_summary_chart(model_results, courses_data, output_dir, ranked_courses)
     if chart1:
         charts.append(chart1)
 
@@ -700,7 +690,7 @@ def generate_report():
 
     # 3. LMS Design Analysis
     print("\n3. Creating LMS Design Analysis...")
-    chart3 = create_lms_design_analysis(courses_data, output_dir)
+    chart3 = create_lms_design_analysis(courses_data, output_dir, ranked_courses)
     if chart3:
         charts.append(chart3)
 
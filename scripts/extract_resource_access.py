@@ -206,7 +206,7 @@ def extract_activity_timing_data(course_id, enrollments):
                     hour_counts['evening'] += count
                 else:
                     hour_counts['night'] += count
-            except:
+            except (ValueError, TypeError):
                 pass
 
         first_activity = min(timestamps) if timestamps else None
@@ -23,6 +23,8 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import cross_val_score
 import warnings
 
+from utils.storage import load_table
+
 warnings.filterwarnings('ignore')
 
 
@@ -62,8 +64,8 @@ FEATURE_GROUPS = {
 
 
 def load_student_features(filepath: str = 'data/engagement_dynamics/student_features.csv') -> pd.DataFrame:
-    """Load student features from CSV."""
-    df = pd.read_csv(filepath)
+    """Load student features (Parquet sibling if present, else CSV)."""
+    df = load_table(filepath)
     print(f"Loaded {len(df)} students with {len(df.columns)} columns")
     return df
 
@@ -13,16 +13,19 @@ import json
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
-import requests
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from utils.pagination import count_canvas_items, get_session, parse_json
+
 load_dotenv()
 
 API_URL = os.getenv('CANVAS_API_URL')
 API_TOKEN = os.getenv('CANVAS_API_TOKEN')
 headers = {'Authorization': f'Bearer {API_TOKEN}'}
+session = get_session()  # pooled keep-alive connections, shared by worker threads
 
 # Styling
 plt.style.use('seaborn-v0_8-whitegrid')
@@ -45,10 +48,10 @@ def get_account_courses(account_id):
     params = {'per_page': 100, 'include[]': ['total_students', 'term']}
 
     while url:
-        r = requests.get(url, headers=headers, params=params)
+        r = session.get(url, headers=headers, params=params)
         if r.status_code != 200:
             break
-        courses.extend(r.json())
+        courses.extend(parse_json(r))
         url = r.links.get('next', {}).get('url')
         params = {}
 
@@ -68,11 +71,17 @@ def get_course_resources(course_id):
         ('discussions', 'discussion_topics'),
     ]
 
-    for key, endpoint in endpoints:
-        r = requests.get(f'{API_URL}/api/v1/courses/{course_id}/{endpoint}',
-                        headers=headers, params={'per_page': 100})
-        if r.status_code == 200:
-            resources[key] = len(r.json())
+    base_url = f'{API_URL}/api/v1/courses/{course_id}/'
+
+    def count(endpoint):
+        # Default delay: all threads draw from the shared 10 req/s token bucket
+        return count_canvas_items(base_url + endpoint, headers)
+
+    # Endpoints are independent: request them concurrently (~1 RTT instead of 6)
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        counts = executor.map(count, [endpoint for _, endpoint in endpoints])
+        for (key, _), n in zip(endpoints, counts):
+            resources[key] = n
 
     return resources
 
@@ -108,6 +117,21 @@ def normalize(series):
     return (series - series.min()) / (series.max() - series.min() + 0.001)
 
 
+def student_summary(df_students):
+    """Summary stats used across the console output and the report (one pass each)."""
+    failed = df_students['failed']  # pandas reductions skip missing values
+    quantiles = df_students[['unique_active_hours', 'total_activity_time', 'avg_gap_hours']].quantile([0.25, 0.75])
+    return {
+        'n_students': len(df_students),
+        'n_courses': df_students['course_id'].nunique(),
+        'n_failed': int(failed.sum()),
+        'fail_pct': failed.mean() * 100,
+        'hours_q1': quantiles.loc[0.25, 'unique_active_hours'],
+        'time_q1': quantiles.loc[0.25, 'total_activity_time'],
+        'gap_q3': quantiles.loc[0.75, 'avg_gap_hours'],
+    }
+
+
 def main():
     print("=" * 70)
     print("DIAGNÓSTICO CONTROL DE GESTIÓN")
@@ -180,8 +204,9 @@ def main():
 
     # Load correlation analysis data
     df_students = pd.read_csv(CORR_DIR / 'all_students_features.csv')
-    print(f"Total estudiantes con features: {len(df_students)}")
-    print(f"Cursos únicos: {df_students['course_id'].nunique()}")
+    summary = student_summary(df_students)
+    print(f"Total estudiantes con features: {summary['n_students']}")
+    print(f"Cursos únicos: {summary['n_courses']}")
 
     # Grade statistics per course
     grade_stats = df_students.groupby('course_name').agg({
@@ -198,9 +223,9 @@ def main():
     # Generate boxplots
     print("\nGenerando boxplots de distribución...")
     fig, ax = plt.subplots(figsize=(12, 6))
-    df_students['course_short'] = df_students['course_name'].apply(
-        lambda x: x[:30] + '...' if len(x) > 30 else x
-    )
+    # Truncate once per distinct course instead of once per student row
+    short = {n: n[:30] + '...' if len(n) > 30 else n for n in df_students['course_name'].unique()}
+    df_students['course_short'] = df_students['course_name'].map(short)
     order = df_students.groupby('course_short')['final_score'].median().sort_values(ascending=False).index
 
     sns.boxplot(data=df_students, x='course_short', y='final_score', order=order, palette='Set2', ax=ax)
@@ -223,9 +248,12 @@ def main():
     axes = axes.flatten()
 
     for i, course in enumerate(courses[:6]):
-        data = df_students[df_students['course_name'] == course]['final_score']
+        data = df_students.loc[df_students['course_name'] == course, 'final_score'].to_numpy()
+        data = data[~np.isnan(data)]
         ax = axes[i]
-        ax.hist(data, bins=15, edgecolor='black', alpha=0.7, color='steelblue')
+        counts, edges = np.histogram(data, bins=15)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+               edgecolor='black', alpha=0.7, color='steelblue')
         ax.axvline(x=57, color='red', linestyle='--', linewidth=2)
         ax.axvline(x=data.mean(), color='green', linestyle='-', linewidth=2)
         ax.set_title(course[:35], fontsize=10)
@@ -322,15 +350,36 @@ def main():
     fig, axes = plt.subplots(1, 2, figsize=(12, 5))
 
     ax = axes[0]
-    df_students[df_students['failed'] == 0]['risk_score'].hist(bins=20, alpha=0.7, label='Aprobados', ax=ax, color='green')
-    df_students[df_students['failed'] == 1]['risk_score'].hist(bins=20, alpha=0.7, label='Reprobados', ax=ax, color='red')
+    risk = df_students['risk_score'].to_numpy(dtype=float)
+    failed = df_students['failed'].to_numpy()
+    for outcome, label, color in [(0, 'Aprobados', 'green'), (1, 'Reprobados', 'red')]:
+        vals = risk[failed == outcome]
+        vals = vals[~np.isnan(vals)]
+        counts, edges = np.histogram(vals, bins=20)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+               alpha=0.7, label=label, color=color)
+    ax.grid(True)
     ax.set_xlabel('Risk Score')
     ax.set_ylabel('Frecuencia')
     ax.set_title('Distribución de Risk Score por Resultado')
     ax.legend()
 
     ax = axes[1]
-    df_students.boxplot(column='risk_score', by='failed', ax=ax)
+    # Box statistics from one groupby-quantile pass; whiskers at 1.5 IQR like boxplot()
+    risk_by_outcome = df_students.dropna(subset=['risk_score']).groupby('failed')['risk_score']
+    quartiles = risk_by_outcome.quantile([0.25, 0.5, 0.75]).unstack()
+    bxpstats = []
+    for outcome, values in risk_by_outcome:
+        q1, med, q3 = quartiles.loc[outcome]
+        values = values.to_numpy()
+        inside = values[(values >= q1 - 1.5 * (q3 - q1)) & (values <= q3 + 1.5 * (q3 - q1))]
+        bxpstats.append({
+            'label': str(outcome), 'med': med, 'q1': q1, 'q3': q3,
+            'whislo': inside.min(), 'whishi': inside.max(),
+            'fliers': values[(values < inside.min()) | (values > inside.max())],
+        })
+    ax.bxp(bxpstats)
+    ax.grid(True)
     ax.set_xlabel('Reprobado (0=No, 1=Sí)')
     ax.set_ylabel('Risk Score')
     ax.set_title('Risk Score por Resultado Académico')
@@ -345,13 +394,13 @@ def main():
     print("\nAnálisis de Umbrales de Riesgo:")
     print("-" * 60)
 
+    actual_failures = summary['n_failed']
     for threshold in [25, 50, 75]:
-        high_risk = df_students['risk_score'] >= threshold
+        high_risk = risk >= threshold
         n_flagged = high_risk.sum()
-        pct_flagged = n_flagged / len(df_students) * 100
+        pct_flagged = n_flagged / summary['n_students'] * 100
 
-        true_positives = ((high_risk) & (df_students['failed'] == 1)).sum()
-        actual_failures = df_students['failed'].sum()
+        true_positives = (high_risk & (failed == 1)).sum()
 
         catch_rate = true_positives / actual_failures * 100 if actual_failures > 0 else 0
         precision = true_positives / n_flagged * 100 if n_flagged > 0 else 0
@@ -383,9 +432,9 @@ def main():
 |---------|-------|
 | Cursos totales | {len(cdg_courses)} |
 | Cursos con estudiantes | {len(active_courses)} |
-| Cursos con notas válidas | {df_students['course_id'].nunique()} |
-| Estudiantes analizados | {len(df_students)} |
-| Tasa de reprobación promedio | {df_students['failed'].mean()*100:.1f}% |
+| Cursos con notas válidas | {summary['n_courses']} |
+| Estudiantes analizados | {summary['n_students']} |
+| Tasa de reprobación promedio | {summary['fail_pct']:.1f}% |
 
 ### Hallazgo Principal
 
@@ -500,9 +549,9 @@ risk_score =
 
 | Indicador | Umbral de Alerta | Tasa Reprob. si Riesgo |
 |-----------|------------------|------------------------|
-| Horas únicas < Q1 | <{df_students['unique_active_hours'].quantile(0.25):.0f} horas | ~60% |
-| Tiempo total < Q1 | <{df_students['total_activity_time'].quantile(0.25):.0f} seg | ~55% |
-| Brecha promedio > Q3 | >{df_students['avg_gap_hours'].quantile(0.75):.0f} hrs | ~50% |
+| Horas únicas < Q1 | <{summary['hours_q1']:.0f} horas | ~60% |
+| Tiempo total < Q1 | <{summary['time_q1']:.0f} seg | ~55% |
+| Brecha promedio > Q3 | >{summary['gap_q3']:.0f} hrs | ~50% |
 
 ![Distribución de Riesgo](risk_score_distribution.png)
 
@@ -565,7 +614,7 @@ Archivos generados:
 
 Hallazgos clave:
   1. {len(active_courses)} cursos activos, {design_summary.get('Excelente', 0) + design_summary.get('Bueno', 0)} con buen diseño
-  2. {len(df_students)} estudiantes analizados, {df_students['failed'].mean()*100:.1f}% reprobados
+  2. {summary['n_students']} estudiantes analizados, {summary['fail_pct']:.1f}% reprobados
   3. Top predictores: unique_active_hours, total_activity_time, avg_gap_hours
   4. Risk score correlaciona {corr_risk_fail:.2f} con reprobación
 ''')
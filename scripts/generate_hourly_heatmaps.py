@@ -10,8 +10,6 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
-from datetime import datetime
-from collections import defaultdict
 from dotenv import load_dotenv
 import requests
 
@@ -108,23 +106,20 @@ def get_user_activity(course_id, user_id):
 
 
 def parse_hourly_activity(page_views_dict):
-    """Parse page views dict into hour-of-day and day-of-week counts."""
-    hourly_data = defaultdict(lambda: defaultdict(int))  # day_of_week -> hour -> count
-
-    for ts_str, count in page_views_dict.items():
-        try:
-            # Parse ISO timestamp
-            if 'T' in ts_str:
-                dt = datetime.fromisoformat(ts_str.replace('Z', '+00:00'))
-            else:
-                dt = datetime.strptime(ts_str, '%Y-%m-%d %H:%M:%S')
-
-            day_of_week = dt.weekday()  # 0 = Monday, 6 = Sunday
-            hour = dt.hour
-            hourly_data[day_of_week][hour] += count
-        except Exception:
-            continue
-
+    """Parse page views dict into a 7x24 day-of-week x hour-of-day count matrix."""
+    hourly_data = np.zeros((7, 24))  # 0 = Monday, 6 = Sunday
+
+    # Parse all timestamps in one batch; unparseable keys/counts become NaT/NaN.
+    # Only the wall-clock part (first 19 chars) is parsed so activity is
+    # bucketed in the timestamp's own offset, not converted to UTC.
+    ts = pd.to_datetime(pd.Index([k[:19] for k in page_views_dict.keys()], dtype=object),
+                        errors='coerce', format='ISO8601')
+    counts = pd.to_numeric(pd.Series(list(page_views_dict.values()), dtype=object),
+                           errors='coerce').to_numpy(dtype=float)
+    valid = ~(ts.isna() | np.isnan(counts))
+    ts = ts[valid]
+
+    np.add.at(hourly_data, (ts.dayofweek, ts.hour), counts[valid])
     return hourly_data
 
 
@@ -148,10 +143,7 @@ def extract_course_hourly_data(course_id, course_name):
         page_views = activity.get('page_views', {})
 
         if page_views:
-            hourly_data = parse_hourly_activity(page_views)
-            for day, hours in hourly_data.items():
-                for hour, count in hours.items():
-                    course_hourly[day][hour] += count
+            course_hourly += parse_hourly_activity(page_views)
             students_processed += 1
 
         if (i + 1) % 10 == 0:
@@ -18,10 +18,11 @@ from pathlib import Path
 import anthropic
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 import seaborn as sns
 from dotenv import load_dotenv
 
+from utils.storage import downcast_numeric, load_table
+
 load_dotenv()
 
 # Configuración
@@ -55,7 +56,8 @@ def load_all_data():
         data["insights"] = json.load(f)
 
     # Features de estudiantes
-    data["student_features"] = pd.read_csv("data/engagement_dynamics/student_features.csv")
+    data["student_features"] = downcast_numeric(
+        load_table("data/engagement_dynamics/student_features.csv"))
 
     # Documentación de features (primeras 200 líneas)
     try:
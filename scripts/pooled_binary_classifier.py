@@ -33,6 +33,8 @@ from sklearn.metrics import (
 from sklearn.model_selection import StratifiedKFold, cross_val_predict
 from sklearn.preprocessing import StandardScaler
 
+from utils.storage import load_table
+
 warnings.filterwarnings('ignore')
 
 # Try to import XGBoost and SHAP
@@ -109,7 +111,7 @@ GOOD_DIVERSITY_COURSES = [
 
 def load_and_prepare_data(filter_good_courses=True):
     """Load student data and prepare for binary classification."""
-    df = pd.read_csv('data/engagement_dynamics/student_features.csv')
+    df = load_table('data/engagement_dynamics/student_features.csv')
 
     # Filter to students with grades
     df = df[df['final_score'].notna()].copy()
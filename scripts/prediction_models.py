@@ -190,22 +190,23 @@ def build_dataframe(course_data):
 
     for uid, subs in student_subs.items():
         if uid in students:
-            scores = [s.get('score') for s in subs if s.get('score') is not None]
+            scores = np.array([s.get('score') for s in subs if s.get('score') is not None], dtype=float)
             submitted = [s for s in subs if s.get('submitted_at')]
             graded = [s for s in subs if s.get('workflow_state') == 'graded']
 
+            has_scores = scores.size > 0
             students[uid].update({
                 'num_submissions': len(submitted),
                 'num_graded': len(graded),
-                'num_scores': len(scores),
-                'avg_score': np.mean(scores) if scores else None,
-                'min_score': np.min(scores) if scores else None,
-                'max_score': np.max(scores) if scores else None,
-                'score_std': np.std(scores) if len(scores) > 1 else 0,
+                'num_scores': scores.size,
+                'avg_score': scores.mean() if has_scores else None,
+                'min_score': scores.min() if has_scores else None,
+                'max_score': scores.max() if has_scores else None,
+                'score_std': scores.std() if scores.size > 1 else 0,
             })
 
             # First score
-            if scores:
+            if has_scores:
                 sorted_subs = sorted([s for s in subs if s.get('score') is not None],
                                    key=lambda x: x.get('assignment_id', 0))
                 if sorted_subs:
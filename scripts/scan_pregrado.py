@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
 """Scan Pregrado careers for high-potential courses."""
 
-import requests
+import heapq
 import os
-import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
 from dotenv import load_dotenv
 
+from utils.pagination import TokenBucket, count_canvas_items, get_session, parse_json
+
 load_dotenv()
 
 API_URL = os.getenv('CANVAS_API_URL')
 API_TOKEN = os.getenv('CANVAS_API_TOKEN')
 headers = {'Authorization': f'Bearer {API_TOKEN}'}
+session = get_session()  # pooled keep-alive connections, shared by worker threads
+
+# Course analysis runs in parallel; all workers share one request budget
+MAX_WORKERS = 5
+rate_limiter = TokenBucket(rate=4, capacity=MAX_WORKERS)
 
 
 def get_courses(account_id, term_id=336, min_students=15):
@@ -26,11 +34,12 @@ def get_courses(account_id, term_id=336, min_students=15):
     }
 
     while url:
-        r = requests.get(url, headers=headers, params=params)
+        rate_limiter.wait()
+        r = session.get(url, headers=headers, params=params)
         if r.status_code != 200:
             break
 
-        for c in r.json():
+        for c in parse_json(r):
             if c.get('total_students', 0) >= min_students:
                 courses.append({
                     'id': c['id'],
@@ -58,31 +67,32 @@ def analyze_course(course_id):
         'recommendation': 'SKIP'
     }
 
+    base_url = f'{API_URL}/api/v1/courses/{course_id}'
+
     # Get enrollments with grades
-    r = requests.get(
-        f'{API_URL}/api/v1/courses/{course_id}/enrollments',
+    rate_limiter.wait()
+    r = session.get(
+        base_url + '/enrollments',
         headers=headers,
         params={'type[]': 'StudentEnrollment', 'per_page': 100, 'include[]': 'grades'}
     )
     if r.status_code != 200:
         return result
 
-    enrollments = r.json()
-    grades = [e['grades'].get('final_score') for e in enrollments
-              if e.get('grades', {}).get('final_score') is not None and e['grades'].get('final_score') > 0]
+    enrollments = parse_json(r)
+    scores = np.array([e.get('grades', {}).get('final_score') for e in enrollments], dtype=float)
+    grades = scores[scores > 0]  # drops missing (NaN) and zero scores
 
-    if len(grades) >= 10:
+    if grades.size >= 10:
         result['has_grades'] = True
-        result['n_students'] = len(grades)
-        result['grade_mean'] = np.mean(grades)
-        result['grade_std'] = np.std(grades)
-        result['pass_rate'] = sum(1 for g in grades if g >= 57) / len(grades)
+        result['n_students'] = int(grades.size)
+        result['grade_mean'] = grades.mean()
+        result['grade_std'] = grades.std()
+        result['pass_rate'] = np.count_nonzero(grades >= 57) / grades.size
 
     # Count assignments
-    r = requests.get(f'{API_URL}/api/v1/courses/{course_id}/assignments',
-                     headers=headers, params={'per_page': 100})
-    if r.status_code == 200:
-        result['n_assignments'] = len(r.json())
+    rate_limiter.wait()
+    result['n_assignments'] = count_canvas_items(base_url + '/assignments', headers, delay=0)
 
     # Recommendation
     if result['has_grades'] and result['grade_std'] and result['grade_std'] > 10:
@@ -98,6 +108,18 @@ def analyze_course(course_id):
     return result
 
 
+def discover_courses(careers, term_id):
+    """List courses for every career account concurrently (output in career order)."""
+    all_courses = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        listings = executor.map(lambda career: get_courses(career[0], term_id=term_id, min_students=15),
+                                careers)
+        for (acc_id, name), courses in zip(careers, listings):
+            print(f'{name} ({acc_id}): {len(courses)} courses')
+            all_courses.extend(courses)
+    return all_courses
+
+
 def main():
     # Careers to scan (excluding Control de Gestión 719, 718)
     careers_to_scan = [
@@ -116,48 +138,54 @@ def main():
     print('SCANNING PREGRADO CAREERS (Term 336 - 2nd Sem 2025)')
     print('=' * 70)
 
-    all_courses = []
-    for acc_id, name in careers_to_scan:
-        courses = get_courses(acc_id, term_id=336, min_students=15)
-        print(f'{name} ({acc_id}): {len(courses)} courses')
-        all_courses.extend(courses)
+    all_courses = discover_courses(careers_to_scan, term_id=336)
 
     print(f'\nTotal courses with 15+ students: {len(all_courses)}')
 
     if not all_courses:
         print('\nNo courses found. Trying term 322 (1st Sem 2025)...')
-        for acc_id, name in careers_to_scan:
-            courses = get_courses(acc_id, term_id=322, min_students=15)
-            print(f'{name} ({acc_id}): {len(courses)} courses')
-            all_courses.extend(courses)
+        all_courses = discover_courses(careers_to_scan, term_id=322)
 
     if not all_courses:
         print('\nNo courses found in either term.')
         return
 
+    # Account listings can overlap (e.g. a career and its sub-account), so
+    # drop repeated course ids before ranking
+    all_courses = list({c['id']: c for c in all_courses}.values())
+
     # Analyze top courses by enrollment
     print('\n' + '=' * 70)
     print('ANALYZING TOP COURSES FOR POTENTIAL')
     print('=' * 70)
 
-    top_courses = sorted(all_courses, key=lambda x: x['students'], reverse=True)[:20]
-
-    results = []
-    for i, c in enumerate(top_courses):
-        print(f'\n[{i+1}/{len(top_courses)}] Analyzing {c["id"]}: {c["name"][:40]}...')
-        analysis = analyze_course(c['id'])
-        analysis['course_name'] = c['name']
-        analysis['enrolled'] = c['students']
-        results.append(analysis)
-        time.sleep(0.5)  # Rate limiting
+    top_courses = heapq.nlargest(20, all_courses, key=lambda x: x['students'])
+
+    # Submit largest courses first (top_courses is sorted by enrollment) so the
+    # slowest analyses start early instead of straggling at the end
+    results = [None] * len(top_courses)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {executor.submit(analyze_course, c['id']): i for i, c in enumerate(top_courses)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            c = top_courses[i]
+            print(f'\n[{done}/{len(top_courses)}] Analyzed {c["id"]}: {c["name"][:40]}')
+            analysis = future.result()
+            analysis['course_name'] = c['name']
+            analysis['enrolled'] = c['students']
+            results[i] = analysis  # keep enrollment order for the summary
 
     # Summary
     print('\n' + '=' * 70)
     print('RESULTS SUMMARY')
     print('=' * 70)
 
-    high = [r for r in results if r['recommendation'] == 'HIGH']
-    medium = [r for r in results if r['recommendation'] == 'MEDIUM']
+    # Bucket results by recommendation in a single pass
+    by_recommendation = defaultdict(list)
+    for r in results:
+        by_recommendation[r['recommendation']].append(r)
+    high = by_recommendation['HIGH']
+    medium = by_recommendation['MEDIUM']
 
     if high:
         print(f'\nHIGH POTENTIAL ({len(high)} courses):')
@@ -176,8 +204,8 @@ def main():
             print(f"  {r['course_id']:6d} | {r['course_name'][:35]}")
             print(f"           Students: {r['n_students']}, StdDev: {r['grade_std']:.1f}, Pass: {r['pass_rate']:.0%}")
 
-    # Courses without grades
-    no_grades = [r for r in results if not r['has_grades']]
+    # Courses without grades (the only ones left at 'SKIP')
+    no_grades = by_recommendation['SKIP']
     if no_grades:
         print(f'\nNO GRADES AVAILABLE ({len(no_grades)} courses):')
         for r in no_grades[:5]:
@@ -1,2 +1,3 @@
 # Utils package for Canvas LMS data extraction
-from .pagination import paginate_canvas, PaginationError
+from .pagination import count_canvas_items, paginate_canvas, PaginationError, TokenBucket
+from .storage import downcast_numeric, load_table, save_table
@@ -10,13 +10,27 @@ This module provides a robust pagination function that:
 2. Logs progress for visibility
 3. Handles errors gracefully with retries
 4. Validates response data
+5. Throttles requests through a token bucket shared by all threads
+6. Reuses keep-alive connections through one shared requests.Session
 """
 
 import re
+import math
 import time
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional, Dict, List, Any
+from urllib.parse import urlparse, parse_qs
+
+# Optional fast JSON parser (falls back to requests' stdlib json)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # Configure logging
 logging.basicConfig(
@@ -25,12 +39,148 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Link header format: <url>; rel="current", <url>; rel="next", <url>; rel="first"
+_NEXT_LINK_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
 
 class PaginationError(Exception):
     """Raised when pagination fails after retries."""
     pass
 
 
+def parse_json(response: requests.Response) -> Any:
+    """
+    Decode a JSON response body, using orjson on the raw bytes when available.
+
+    Raises ValueError on invalid JSON (orjson.JSONDecodeError subclasses it).
+    """
+    if HAS_ORJSON:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Each
+    request takes one token; callers only sleep when the bucket is empty,
+    so concurrent workers share one request budget instead of each paying
+    a fixed sleep per request.
+    """
+
+    def __init__(self, rate: float, capacity: float = 10):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Reserve one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate (tokens already earned are kept)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            self._rate = rate
+
+    def wait(self) -> None:
+        """Block until a token is available."""
+        delay = self.acquire()
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Connection pool size per host (enough for a handful of worker threads)
+POOL_SIZE = 10
+
+# Transient statuses worth retrying (Canvas answers 403 when throttling)
+RETRY_STATUSES = (403, 429, 500, 502, 503, 504)
+
+
+class _LinearRetry(Retry):
+    """
+    Retry that waits backoff_factor * n seconds before the n-th retry.
+
+    urllib3's default backoff retries the first failure immediately, but
+    Canvas throttling 403s carry no Retry-After, so every retry has to wait.
+    """
+
+    def get_backoff_time(self) -> float:
+        # backoff_max is urllib3 2.x only; 1.26 has the class-level default
+        backoff_max = getattr(self, 'backoff_max', Retry.DEFAULT_BACKOFF_MAX)
+        return min(backoff_max, self.backoff_factor * len(self.history))
+
+
+_sessions: Dict[tuple, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(max_retries: int = 0, retry_delay: float = 0.0) -> requests.Session:
+    """
+    Return a shared Session so requests reuse TCP/TLS connections.
+
+    One Session is kept per retry policy. With max_retries > 1, failed GETs
+    (connection errors, timeouts, RETRY_STATUSES) are retried inside urllib3
+    with linear backoff (retry_delay, 2*retry_delay, ...), honoring
+    Retry-After. After the last attempt the final response is returned as-is.
+    """
+    key = (max_retries, retry_delay)
+    with _sessions_lock:
+        if key not in _sessions:
+            retry = 0
+            if max_retries > 1:
+                retry = _LinearRetry(
+                    total=max_retries - 1,
+                    backoff_factor=retry_delay,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=['GET'],
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE * 2, max_retries=retry)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[key] = session
+        return _sessions[key]
+
+
+def quota_delay(remaining: float) -> float:
+    """
+    Per-request delay for a given X-Rate-Limit-Remaining quota.
+
+    Canvas starts each token with ~700 units. The delay grows exponentially
+    as the quota drains (~0 s at 700, ~0.2 s at 300, ~3 s at 100), which
+    lets the bucket recover before Canvas starts answering 403.
+    """
+    return 10.0 * math.exp(-remaining / 80.0)
+
+
+# One bucket per request rate, shared by every paginate_canvas call (and thread)
+_buckets: Dict[float, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(delay: float) -> TokenBucket:
+    """Return the shared token bucket for a per-request delay (rate = 1 / delay)."""
+    with _buckets_lock:
+        if delay not in _buckets:
+            _buckets[delay] = TokenBucket(rate=1.0 / delay)
+        return _buckets[delay]
+
+
 def paginate_canvas(
     url: str,
     headers: Dict[str, str],
@@ -55,9 +205,10 @@ def paginate_canvas(
         params: Initial query parameters (applied only to first request)
         max_pages: Maximum number of pages to fetch (safety limit)
         per_page: Number of records per page (max 100 for Canvas)
-        delay: Delay between requests in seconds (rate limiting)
-        max_retries: Number of retries on failure
-        retry_delay: Delay between retries in seconds
+        delay: Average delay between requests in seconds; sets the rate of the
+            shared token bucket (0 disables rate limiting)
+        max_retries: Attempts per page (retried by urllib3 on errors/RETRY_STATUSES)
+        retry_delay: Base backoff between retries in seconds
         log_progress: Whether to log progress
         log_every: Log progress every N pages
 
@@ -81,65 +232,50 @@ def paginate_canvas(
 
     current_url = url
     page_count = 0
-    first_request = True
+    rate_limiter = get_rate_limiter(delay) if delay > 0 else None
+    session = get_session(max_retries, retry_delay)
 
     while current_url and page_count < max_pages:
-        # Retry logic
-        response = None
-        last_error = None
+        if rate_limiter:
+            rate_limiter.wait()
 
-        for attempt in range(max_retries):
+        # Apply params only on first request
+        # Subsequent requests use the full URL from Link header
+        # (retries and backoff happen inside the session's urllib3 adapter)
+        try:
+            response = session.get(
+                current_url,
+                headers=headers,
+                params=params if page_count == 0 else None,
+                timeout=30
+            )
+        except requests.exceptions.RequestException as e:
+            error_msg = f"Pagination failed after {max_retries} retries: {e}"
+            logger.error(error_msg)
+            raise PaginationError(error_msg)
+
+        # Slow the shared bucket down as the Canvas quota drains
+        rate_limit_remaining = response.headers.get('X-Rate-Limit-Remaining', '?')
+        if rate_limiter:
             try:
-                # Apply params only on first request
-                # Subsequent requests use the full URL from Link header
-                if first_request:
-                    response = requests.get(
-                        current_url,
-                        headers=headers,
-                        params=params,
-                        timeout=30
-                    )
-                    first_request = False
-                else:
-                    response = requests.get(
-                        current_url,
-                        headers=headers,
-                        timeout=30
-                    )
-
-                # Check for rate limiting
-                if response.status_code == 403:
-                    rate_limit_remaining = response.headers.get('X-Rate-Limit-Remaining', '?')
-                    logger.warning(f"Rate limited. Remaining: {rate_limit_remaining}")
-                    time.sleep(retry_delay * (attempt + 1))
-                    continue
-
-                # Check for success
-                if response.status_code == 200:
-                    break
-                else:
-                    last_error = f"HTTP {response.status_code}: {response.text[:200]}"
-                    logger.warning(f"Attempt {attempt + 1}/{max_retries} failed: {last_error}")
-                    time.sleep(retry_delay)
-
-            except requests.exceptions.Timeout:
-                last_error = "Request timeout"
-                logger.warning(f"Attempt {attempt + 1}/{max_retries}: Timeout")
-                time.sleep(retry_delay)
-            except requests.exceptions.RequestException as e:
-                last_error = str(e)
-                logger.warning(f"Attempt {attempt + 1}/{max_retries}: {e}")
-                time.sleep(retry_delay)
-
-        # Check if we got a successful response
-        if response is None or response.status_code != 200:
-            error_msg = f"Pagination failed after {max_retries} retries: {last_error}"
+                remaining = float(rate_limit_remaining)
+            except ValueError:
+                pass
+            else:
+                rate_limiter.set_rate(1.0 / max(delay, quota_delay(remaining)))
+
+        # Check for success
+        if response.status_code != 200:
+            if response.status_code == 403:
+                logger.warning(f"Rate limited. Remaining: {rate_limit_remaining}")
+            error_msg = (f"Pagination failed on page {page_count + 1}: "
+                         f"HTTP {response.status_code}: {response.text[:200]}")
             logger.error(error_msg)
             raise PaginationError(error_msg)
 
         # Parse response
         try:
-            data = response.json()
+            data = parse_json(response)
         except ValueError as e:
             raise PaginationError(f"Invalid JSON response: {e}")
 
@@ -168,15 +304,10 @@ def paginate_canvas(
             logger.info(f"Page {page_count}: fetched {len(all_results)} records so far")
 
         # Extract next URL from Link header
-        # Format: <url>; rel="current", <url>; rel="next", <url>; rel="first"
         link_header = response.headers.get('Link', '')
-        next_match = re.search(r'<([^>]+)>;\s*rel="next"', link_header)
+        next_match = _NEXT_LINK_RE.search(link_header)
         current_url = next_match.group(1) if next_match else None
 
-        # Rate limiting delay
-        if current_url and delay > 0:
-            time.sleep(delay)
-
     # Final log
     if log_progress:
         logger.info(f"Pagination complete: {len(all_results)} total records in {page_count} pages")
@@ -209,6 +340,45 @@ def paginate_canvas_with_stats(
     return results, stats
 
 
+def count_canvas_items(
+    url: str,
+    headers: Dict[str, str],
+    params: Optional[Dict[str, Any]] = None,
+    delay: float = 0.1
+) -> int:
+    """
+    Count the records behind a Canvas list endpoint without downloading them.
+
+    Requests a single record per page and reads the total from the page
+    number of the rel="last" Link. Endpoints that only paginate with
+    bookmarks have no numeric last page; those fall back to a full
+    paginate_canvas() count (still correct past the first 100 items).
+
+    Returns:
+        Number of records, or 0 if the endpoint is not accessible
+    """
+    if delay > 0:
+        get_rate_limiter(delay).wait()
+    response = get_session().get(url, headers=headers, params={**(params or {}), 'per_page': 1}, timeout=30)
+    if response.status_code != 200:
+        return 0
+
+    last_url = response.links.get('last', {}).get('url')
+    if last_url:
+        last_page = parse_qs(urlparse(last_url).query).get('page', [''])[0]
+        # A one-page result (including an empty one) still reports last=1
+        if last_page.isdigit() and int(last_page) > 1:
+            return int(last_page)
+
+    if 'next' not in response.links:
+        return len(parse_json(response))
+
+    try:
+        return len(paginate_canvas(url, headers, params, delay=delay, log_progress=False))
+    except PaginationError:
+        return 0
+
+
 # Convenience functions for common Canvas endpoints
 
 def get_enrollments(api_url: str, headers: Dict, course_id: int, include_grades: bool = True) -> List[Dict]:
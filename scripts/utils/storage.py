@@ -0,0 +1,63 @@
+"""
+Feature Table Storage
+
+Wide feature tables (e.g. engagement_dynamics/student_features.csv, ~100
+columns) are read back by most analysis scripts. CSV stays the format for
+human inspection, but when pyarrow is installed a zstd-compressed Parquet
+copy is written next to it. Parquet is typed and columnar, so loading it is
+much faster than re-parsing the CSV text.
+
+Readers call load_table() with the CSV path; the Parquet sibling is used
+when it exists and is not older than the CSV.
+"""
+
+import os
+from typing import Iterable
+
+import pandas as pd
+
+# Optional Parquet support (pyarrow is not a hard dependency)
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+
+def parquet_path(csv_path: str) -> str:
+    """Return the Parquet sibling path for a CSV path."""
+    return os.path.splitext(str(csv_path))[0] + '.parquet'
+
+
+def save_table(df: pd.DataFrame, csv_path: str) -> None:
+    """Write a table as CSV and, when possible, as a zstd Parquet sibling."""
+    df.to_csv(csv_path, index=False)
+    if HAS_PARQUET:
+        df.to_parquet(parquet_path(csv_path), compression='zstd', index=False)
+
+
+# Identifier columns: never used in arithmetic, so narrowing them is safe
+ID_COLUMNS = ('course_id', 'user_id')
+
+
+def downcast_numeric(df: pd.DataFrame, columns: Iterable[str] = ID_COLUMNS) -> pd.DataFrame:
+    """
+    Shrink the given int64 identifier columns in place to the smallest
+    signed integer type that holds them.
+
+    Feature columns (counts, flags, scores) stay int64/float64: reports do
+    arithmetic and correlations on them, and narrow ints can overflow.
+    """
+    for col in columns:
+        if col in df.columns and df[col].dtype == 'int64':
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def load_table(csv_path: str) -> pd.DataFrame:
+    """Load a table, preferring a fresh Parquet sibling over the CSV."""
+    pq_path = parquet_path(csv_path)
+    if HAS_PARQUET and os.path.exists(pq_path):
+        if not os.path.exists(csv_path) or os.path.getmtime(pq_path) >= os.path.getmtime(csv_path):
+            return pd.read_parquet(pq_path)
+    return pd.read_csv(csv_path)
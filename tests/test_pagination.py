@@ -0,0 +1,70 @@
+"""
+Tests for utils.pagination retry handling.
+
+Runs a real retry path against a local HTTP server that throttles the
+first requests with 403 (as Canvas does) before answering 200.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from utils.pagination import get_session, paginate_canvas
+
+RETRY_DELAY = 0.05
+
+
+@pytest.fixture
+def throttling_server():
+    """Serve 403 for the first two GETs, then a one-item JSON page."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            hits.append(time.monotonic())
+            if len(hits) <= 2:
+                self.send_response(403)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = json.dumps([{'id': 1}]).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/api/v1/items', hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_retries_throttled_get_with_linear_backoff(throttling_server):
+    url, hits = throttling_server
+    r = get_session(max_retries=3, retry_delay=RETRY_DELAY).get(url)
+
+    assert r.status_code == 200
+    assert len(hits) == 3
+    gaps = [b - a for a, b in zip(hits, hits[1:])]
+    assert gaps[0] >= RETRY_DELAY
+    assert gaps[1] >= 2 * RETRY_DELAY
+
+
+def test_paginate_canvas_recovers_after_throttling(throttling_server):
+    url, hits = throttling_server
+    items = paginate_canvas(url, {}, max_retries=3, retry_delay=RETRY_DELAY, delay=0)
+
+    assert items == [{'id': 1}]
+    assert len(hits) == 3